@@ -1,21 +1,207 @@
 #!/usr/bin/env python3
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
 from datetime import datetime
 import ollama
+import orjson
+import os
 import re
 import ast
 import operator
+import string
+import math
+import threading
+import logging
+import logging.handlers
+import queue
+import atexit
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+
+try:
+    import ahocorasick  # optional: pyahocorasick, one pass for phrase intents
+except ImportError:
+    ahocorasick = None
 
 # ============================
 # CONFIG
 # ============================
 HOST = "0.0.0.0"
 PORT = 8000
-OLLAMA_MODEL = "llama3.1:8b"
+AARYA_PERSONA = os.environ.get("AARYA_PERSONA", "v1")  # v1 | v2, see PERSONAS
+# Replies are one short sentence, so a 4-bit 1B model is plenty and several
+# times faster than llama3.1:8b.  ollama pull llama3.2:1b-instruct-q4_K_M
+OLLAMA_MODEL = os.environ.get("OLLAMA_MODEL", "llama3.2:1b-instruct-q4_K_M")
+OLLAMA_KEEP_ALIVE = -1           # never unload model + prompt cache between visitors
+OLLAMA_OPTIONS = {
+    "num_predict": 80,           # one sentence under 40 words fits easily
+    "stop": ["\n\n"],            # a second paragraph means the model is rambling
+    "temperature": 0.3,          # steadier answers also help the semantic cache
+    "top_p": 0.9,
+}
+
+# Semantic cache for Ollama replies (paraphrases reuse a previous answer)
+EMBED_MODEL = "all-minilm"       # all-MiniLM-L6-v2 served by Ollama
+SEMANTIC_THRESHOLD = 0.88        # cosine similarity needed for a hit
+SEMANTIC_CACHE_SIZE = 512
+SEMANTIC_CACHE_TTL = 24 * 60 * 60
+
+# Parallel generation happens on the Ollama side, start it with:
+#   OLLAMA_NUM_PARALLEL=4 OLLAMA_MAX_LOADED_MODELS=2 ollama serve
+# Two model slots: the chat model and EMBED_MODEL both stay loaded, otherwise
+# every fallback swaps one out to load the other.
+
+# Sizes each worker's /ask_batch pool. The limit is per worker process and
+# ignores plain /ask threads, so with N gunicorn workers batch traffic alone
+# can have N x OLLAMA_NUM_PARALLEL chats in flight; extras queue in Ollama.
+OLLAMA_NUM_PARALLEL = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+BATCH_MAX_TEXTS = 32             # largest list /ask_batch accepts
 
 app = Flask(__name__)
 
+# ============================
+# PERSONAS
+# ============================
+# Intent tables are (name, pattern, reply); order is priority, first match wins.
+# Replies for DATETIME_INTENTS are strftime formats filled at request time.
+PERSONAS = {
+    "v1": {
+        "math_reply": "The answer is: {}.",
+        "fullmatch_intents": [
+            ("greeting", r"(?:hi|hello|hey|namaste)(?: aarya| ariya)?|hello arya",
+             "Hello, I am Aarya, how can I assist you today."),
+            ("thanks", r"thanks|thank you|thank u",
+             "You are welcome."),
+        ],
+        "search_intents": [
+            # ---- Time & Date ----
+            ("time", r"\b(?:current time|time now)\b", "The current time is %I:%M %p."),
+            ("date", r"\b(?:date today|today date)\b", "Today's date is %d %B %Y."),
+            ("day", r"\b(?:today day|what day)\b", "Today is %A."),
+            ("month", r"\bcurrent month\b", "The current month is %B."),
+            ("year", r"\bcurrent year\b", "The current year is %Y."),
+
+            # ---- Identity ----
+            ("who", r"\bwho are you\b",
+             "I am Aarya, a humanoid receptionist robot developed by Ecruxbot."),
+            ("name", r"\byour name\b", "My name is Aarya."),
+            ("how", r"\bhow are you\b", "I am fine, thank you for asking."),
+            ("features", r"\bfeatures\b",
+             "I can communicate through speech, answer visitor queries, and showcase company technologies."),
+
+            # ---- Company ----
+            ("company", r"\b(?:ecruxbot|tell me about your company|about your company|your company)\b",
+             "Ecruxbot is an Indian robotics and artificial intelligence company."),
+            ("team", r"\bteam\b",
+             "The Ecruxbot team includes Hitendra Valhe, Bhagyesh Tajne, and Virendra Valhe."),
+            ("website", r"\bwebsite\b", "Our official website is ecruxbot.in."),
+            ("contact", r"\b(?:contact|email)\b", "You can contact Ecruxbot at ecruxbot@gmail.com."),
+            ("purpose", r"\bpurpose\b|\bwhy are you here\b",
+             "I am designed to assist visitors and provide information."),
+            ("language", r"\blanguage\b",
+             "I currently speak English and will support Hindi and Marathi in the future."),
+        ],
+        "system_prompt": (
+            "You are Aarya, a friendly humanoid receptionist created by Ecruxbot.\n"
+            "Speak like a calm, helpful human using simple, natural English.\n"
+            "Always reply in ONE short sentence, under 40 words.\n"
+            "Be confident but polite.\n"
+            "Do not explain steps or reasoning.\n"
+            "If you are unsure or the information may be incorrect, say exactly:\n"
+            "'I don’t have information about that right now.'\n"
+            "Never guess or assume facts.\n"
+            "Never mention being an AI, model, or chatbot.\n"
+            "Do not roleplay as a hotel or service desk."
+        ),
+    },
+    "v2": {
+        "math_reply": "The answer is {}.",
+        "fullmatch_intents": [
+            ("greeting", r"(?:hi|hello|hey|namaste)(?: aarya| ariya)?",
+             "Hello! I am Aarya. How can I help you today?"),
+            ("thanks", r"thanks|thank you|thank u",
+             "You are welcome! "),
+            ("farewell", r"bye|goodbye|see you",
+             "Goodbye! Have a great day."),
+        ],
+        "search_intents": [
+            # ---- Time & Date ----
+            ("time", r"\b(?:current time|time now)\b", "The current time is %I:%M %p."),
+            ("date", r"\b(?:date today|today date|what is the date)\b", "Today's date is %d %B %Y."),
+            ("day", r"\b(?:today day|what day is it)\b", "Today is %A."),
+
+            # ---- Hello Arya (specific) ----
+            ("hello_aarya", r"\bhello\s+(?:aarya|arya|aria)\b",
+             "Hello! I am Aarya. How can I help you today?"),
+
+            # ---- Identity ----
+            ("who", r"\bwho are you\b",
+             "I am Aarya, your friendly humanoid receptionist robot."),
+            ("name", r"\byour name\b", "My name is Aarya."),
+
+            # ---- Company ----
+            ("company", r"\b(?:ecruxbot|your company|about your company|tell me about your company)\b",
+             "Ecruxbot is an Indian company creating robots and AI solutions for everyone"),
+            ("team", r"\b(?:your team|tell me about your team|who is in your team)\b",
+             "Our team consists of Hitendra Valhe, Virendra Valhe, and Bhagyesh Tajne."),
+            ("website", r"\bwebsite\b", "You can visit our website at ecruxbot.in."),
+            ("location", r"\blocation|address\b",
+             "Our office is at 2nd Floor, Near M. J. College, Jalgaon, Maharashtra, India."),
+
+            # ---- Help & Services ----
+            ("services", r"\bwhat can you do|services|help\b",
+             "I can answer questions, tell time, provide company info, and chat with you."),
+        ],
+        "system_prompt": (
+            "You are Aarya, a professional humanoid receptionist robot.\n"
+            "Rules you MUST follow:\n"
+            "1. Reply in ONLY ONE short sentence.\n"
+            "2. Use simple, polite, and clear English.\n"
+            "3. Do NOT use asterisks, sound effects, actions, emotions, or roleplay.\n"
+            "4. Do NOT add extra details or explanations.\n"
+            "5. Never say you are an AI, model, assistant, or chatbot.\n"
+            "6. Do NOT greet unless the user greets first.\n"
+            "7. If the question is unknown, reply exactly:\n"
+            "\"I do not have knowledge about that right now.\"\n"
+            "Your role:\n"
+            "Answer like a calm office receptionist, not a storyteller."
+        ),
+    },
+}
+
+if AARYA_PERSONA not in PERSONAS:
+    raise ValueError(
+        f"Unknown AARYA_PERSONA {AARYA_PERSONA!r}, expected one of: {', '.join(PERSONAS)}"
+    )
+PERSONA = PERSONAS[AARYA_PERSONA]
+MATH_REPLY = PERSONA["math_reply"]
+FULLMATCH_INTENTS = PERSONA["fullmatch_intents"]
+SEARCH_INTENTS = PERSONA["search_intents"]
+# Sent unchanged on every call: Ollama reuses its KV cache for the part of a
+# prompt that matches the previous one, so this prefix is not re-evaluated
+# as long as the model stays loaded.
+SYSTEM_PROMPT = PERSONA["system_prompt"]
+
+# ============================
+# LOGGING
+# ============================
+# Request threads only enqueue records; one listener thread writes stdout,
+# so workers never wait on the stdout lock.
+_log_queue = queue.Queue(-1)
+logger = logging.getLogger("aarya")
+logger.setLevel(logging.INFO)
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+logger.propagate = False
+
+_log_stdout = logging.StreamHandler(sys.stdout)
+_log_stdout.setFormatter(logging.Formatter("%(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stdout)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
 # ============================
 # SAFE MATH ENGINE
 # ============================
@@ -43,22 +229,49 @@ ALLOWED_OPS = {
     ast.Div: operator.truediv
 }
 
+# "a <op> b" covers almost every spoken sum, so it skips ast.parse entirely
+_SIMPLE_MATH_RE = re.compile(r"\s*(-?\d+(?:\.\d+)?)\s*([+\-*/])\s*(-?\d+(?:\.\d+)?)\s*")
+_BINOP = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv
+}
+
+_NUM_WORDS_RE = re.compile(r"\b(" + "|".join(map(re.escape, NUM_WORDS)) + r")\b")
+_X_OP_RE = re.compile(r"(\d)\s*x\s*(\d)")
+_OP_REPLACEMENTS = tuple(OP_WORDS.items())
+_CLEAN_RE = re.compile(r"[^\d+\-*/. ]")
+_DIGITS = frozenset("0123456789")
+# "x" stays a trigger so "three x four" still reaches words_to_numbers
+_MATH_KEYWORDS_RE = re.compile(
+    "plus|minus|into|times|multiply|multiplied|divide|divided|x"
+)
+
 def words_to_numbers(text: str) -> str:
-    for word, num in NUM_WORDS.items():
-        text = re.sub(rf"\b{word}\b", str(num), text)
-    return text
+    return _NUM_WORDS_RE.sub(lambda m: str(NUM_WORDS[m.group(0)]), text)
 
 def words_to_operators(text: str) -> str:
-    text = re.sub(r"(\d)\s*x\s*(\d)", r"\1*\2", text)  # ✅ ADD THIS
-    for word, op in OP_WORDS.items():
+    text = _X_OP_RE.sub(r"\1*\2", text)  # ✅ ADD THIS
+    for word, op in _OP_REPLACEMENTS:
         text = text.replace(word, op)
     return text
 
 
+def _to_number(token: str):
+    return float(token) if "." in token else int(token)
+
 def safe_eval(expr: str):
+    m = _SIMPLE_MATH_RE.fullmatch(expr)
+    if m:
+        left, op, right = m.groups()
+        return _BINOP[op](_to_number(left), _to_number(right))
+
     def _eval(node):
-        if isinstance(node, ast.Num):
-            return node.n
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -_eval(node.operand)
         if isinstance(node, ast.BinOp):
             if type(node.op) not in ALLOWED_OPS:
                 raise ValueError("Invalid operator")
@@ -73,160 +286,430 @@ def safe_eval(expr: str):
 def try_math(text: str):
     t = text.lower()
 
-    if not re.search(r"(plus|minus|into|times|multiply|multiplied|divide|divided|\d|x)", t):
+    if _DIGITS.isdisjoint(t) and not _MATH_KEYWORDS_RE.search(t):
         return None
 
     t = words_to_numbers(t)
     t = words_to_operators(t)
-    t = re.sub(r"[^\d+\-*/. ]", "", t).strip()
+    t = _CLEAN_RE.sub("", t).strip()
 
+    return _math_answer(t)
+
+# Keyed on the cleaned expression, so "2 + 2" and "two plus two" share an entry.
+@lru_cache(maxsize=2048)
+def _math_answer(expr: str):
     try:
-        result = safe_eval(t)
+        result = safe_eval(expr)
         if isinstance(result, float) and result.is_integer():
             result = int(result)
-        return f"The answer is: {result}."
+        return MATH_REPLY.format(result)
     except Exception:
         return None
 
 # ============================
 # TEXT NORMALIZER
 # ============================
+# "_" counts as a word character, so it is kept like before.
+_PUNCT_TABLE = str.maketrans(
+    "", "", string.punctuation.replace("_", "") + "‘’“”–—…¡¿"
+)
+
 def normalize_intent(text: str) -> str:
     text = text.lower().strip()
-    text = re.sub(r"[^\w\s]", "", text)
+    text = text.translate(_PUNCT_TABLE)
     return text
 
 # ============================
 # FAST LOCAL ANSWERS
 # ============================
-def local_answer(text: str):
-    t = normalize_intent(text)
-
-    # ---- Greetings ----
-    if re.fullmatch(r"(hi|hello|hey|namaste)( aarya| ariya)?", t):
-        return "Hello, I am Aarya, how can I assist you today."
-        
-    if re.fullmatch(r"hello arya", t):
-    	return "Hello, I am Aarya, how can I assist you today."
-
-    # ---- Time & Date ----
-    if re.search(r"\b(current time|time now)\b", t):
-        return datetime.now().strftime("The current time is %I:%M %p.")
-    if re.search(r"\b(date today|today date)\b", t):
-        return datetime.now().strftime("Today's date is %d %B %Y.")
-    if re.search(r"\b(today day|what day)\b", t):
-        return datetime.now().strftime("Today is %A.")
-    if re.search(r"\b(current month)\b", t):
-        return datetime.now().strftime("The current month is %B.")
-    if re.search(r"\b(current year)\b", t):
-        return datetime.now().strftime("The current year is %Y.")
-
-    # ---- Identity ----
-    if re.search(r"\bwho are you\b", t):
-        return "I am Aarya, a humanoid receptionist robot developed by Ecruxbot."
-    if re.search(r"\byour name\b", t):
-        return "My name is Aarya."
-    if re.search(r"\bhow are you\b", t):
-        return "I am fine, thank you for asking."
-
-    if re.search(r"\bfeatures\b", t):
-        return "I can communicate through speech, answer visitor queries, and showcase company technologies."
-
-    # ---- Company ----
-    
-    if re.search(r"\becruxbot\b", t):
-        return "Ecruxbot is an Indian robotics and artificial intelligence company."
-    if re.search(r"\b(tell me about your company|about your company|your company)\b", t):
-    	return "Ecruxbot is an Indian robotics and artificial intelligence company."
-
-    if re.search(r"\bteam\b", t):
-        return "The Ecruxbot team includes Hitendra Valhe, Bhagyesh Tajne, and Virendra Valhe."
-    if re.search(r"\bwebsite\b", t):
-        return "Our official website is ecruxbot.in."
-    if re.search(r"\b(contact|email)\b", t):
-        return "You can contact Ecruxbot at ecruxbot@gmail.com."
-    if re.search(r"\bpurpose\b|\bwhy are you here\b", t):
-        return "I am designed to assist visitors and provide information."
-    if re.search(r"\blanguage\b", t):
-        return "I currently speak English and will support Hindi and Marathi in the future."
-
-    # ---- Thank you (ONLY if standalone) ----
-    if re.fullmatch(r"(thanks|thank you|thank u)", t):
-        return "You are welcome."
 
+DATETIME_INTENTS = {"time", "date", "day", "month", "year"}
+
+_REPLIES = {name: reply for name, _, reply in FULLMATCH_INTENTS + SEARCH_INTENTS}
+
+_PRIORITY = {name: i for i, (name, _, _) in enumerate(SEARCH_INTENTS)}
+
+_BOUNDED_GROUP_RE = re.compile(r"\\b\(\?:([\w |]+)\)\\b")
+_BOUNDED_PHRASE_RE = re.compile(r"\\b([\w ]+)\\b")
+
+def _literal_phrases(pattern: str):
+    """Phrases of a \\b-bounded literal pattern like \\b(?:a|b c)\\b, else None."""
+    m = _BOUNDED_GROUP_RE.fullmatch(pattern)
+    if m:
+        return m.group(1).split("|")
+    parts = [_BOUNDED_PHRASE_RE.fullmatch(p) for p in pattern.split("|")]
+    if all(parts):
+        return [p.group(1) for p in parts]
     return None
+
+# Plain phrase intents go into one Aho-Corasick automaton when it is
+# installed; anything needing real regex stays in _INTENT_RE.
+_PHRASE_AUTOMATON = None
+_REGEX_INTENTS = SEARCH_INTENTS
+if ahocorasick is not None:
+    _PHRASE_AUTOMATON = ahocorasick.Automaton()
+    _REGEX_INTENTS = []
+    for name, pat, reply in SEARCH_INTENTS:
+        phrases = _literal_phrases(pat)
+        if phrases is None:
+            _REGEX_INTENTS.append((name, pat, reply))
+            continue
+        for phrase in phrases:
+            if phrase not in _PHRASE_AUTOMATON:  # keep the higher-priority intent
+                _PHRASE_AUTOMATON.add_word(phrase, (_PRIORITY[name], name, len(phrase)))
+    _PHRASE_AUTOMATON.make_automaton()
+
+# One pattern per table; named groups tell us which intent fired.
+_FULLMATCH_RE = re.compile(
+    "|".join(f"(?P<{name}>{pat})" for name, pat, _ in FULLMATCH_INTENTS)
+)
+_INTENT_RE = re.compile(
+    "|".join(f"(?P<{name}>{pat})" for name, pat, _ in _REGEX_INTENTS)
+) if _REGEX_INTENTS else None
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+def _match_phrases(t: str):
+    # Same result as the \\b...\\b regexes: best-priority phrase on word boundaries
+    best = None
+    for end, (priority, name, length) in _PHRASE_AUTOMATON.iter(t):
+        start = end - length + 1
+        if start > 0 and _is_word_char(t[start - 1]):
+            continue
+        if end + 1 < len(t) and _is_word_char(t[end + 1]):
+            continue
+        if best is None or priority < best[0]:
+            best = (priority, name)
+    return best
+
+def _match_regex(t: str):
+    # Leftmost search only; at each start the alternation already prefers
+    # the earlier intent, so walk the start positions and keep the best one.
+    best = None
+    pos = 0
+    while True:
+        m = _INTENT_RE.search(t, pos)
+        if m is None:
+            return best
+        priority = _PRIORITY[m.lastgroup]
+        if best is None or priority < best[0]:
+            best = (priority, m.lastgroup)
+            if priority == 0:
+                return best
+        pos = m.start() + 1
+
+# Only the intent name is cached; date/time replies are still rendered per call.
+@lru_cache(maxsize=2048)
+def _classify(t: str):
+    # ---- Greetings / Thank you (ONLY if standalone) ----
+    m = _FULLMATCH_RE.fullmatch(t)
+    if m:
+        return m.lastgroup
+
+    best = _match_phrases(t) if _PHRASE_AUTOMATON is not None else None
+    found = _match_regex(t) if _INTENT_RE is not None else None
+    if found and (best is None or found[0] < best[0]):
+        best = found
+    return best[1] if best else None
+
+def local_answer(text: str):
+    intent = _classify(normalize_intent(text))
+    if intent is None:
+        return None
+
+    reply = _REPLIES[intent]
+    if intent in DATETIME_INTENTS:
+        return datetime.now().strftime(reply)
+    return reply
+
+# ============================
+# SEMANTIC CACHE
+# ============================
+class SemanticCache:
+    """In-memory prompt -> reply cache matched by embedding similarity."""
+
+    def __init__(self, model, threshold, maxsize, ttl):
+        self.model = model
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()  # text -> (unit vector, reply, stored_at)
+        self._lock = threading.Lock()
+
+    def embed(self, text: str):
+        return self.embed_many([text])[0]
+
+    def embed_many(self, texts):
+        # One Ollama call for the whole list
+        vecs = ollama.embed(
+            model=self.model, input=texts, keep_alive=OLLAMA_KEEP_ALIVE
+        )["embeddings"]
+        return [self._unit(vec) for vec in vecs]
+
+    @staticmethod
+    def _unit(vec):
+        norm = math.sqrt(sum(x * x for x in vec)) or 1.0
+        return [x / norm for x in vec]
+
+    def get(self, text: str, vec):
+        now = time.time()
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if now - e[2] > self.ttl]:
+                del self._entries[key]
+
+            entry = self._entries.get(text)
+            if entry:
+                self._entries.move_to_end(text)
+                return entry[1]
+
+            entries = list(self._entries.items())
+
+        # Scoring is the slow part, so it runs without holding the lock
+        best_key, best_reply, best_score = None, None, self.threshold
+        for key, (cached_vec, reply, _) in entries:
+            score = sum(map(operator.mul, vec, cached_vec))
+            if score >= best_score:
+                best_key, best_reply, best_score = key, reply, score
+
+        if best_key is not None:
+            with self._lock:
+                if best_key in self._entries:
+                    self._entries.move_to_end(best_key)
+        return best_reply
+
+    def set(self, text: str, vec, reply: str):
+        with self._lock:
+            self._entries[text] = (vec, reply, time.time())
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+semantic_cache = SemanticCache(
+    EMBED_MODEL, SEMANTIC_THRESHOLD, SEMANTIC_CACHE_SIZE, SEMANTIC_CACHE_TTL
+)
+
 # ============================
 # OLLAMA
 # ============================
-def ollama_reply(prompt: str) -> str:
-    system_prompt = (
-    "You are Aarya, a friendly humanoid receptionist created by Ecruxbot.\n"
-    "Speak like a calm, helpful human using simple, natural English.\n"
-    "Always reply in ONE short sentence, under 40 words.\n"
-    "Be confident but polite.\n"
-    "Do not explain steps or reasoning.\n"
-    "If you are unsure or the information may be incorrect, say exactly:\n"
-    "'I don’t have information about that right now.'\n"
-    "Never guess or assume facts.\n"
-    "Never mention being an AI, model, or chatbot.\n"
-    "Do not roleplay as a hotel or service desk."
-    )
 
-    response = ollama.chat(
+# Request threads already overlap their blocking chats; this per-worker pool
+# only fans out /ask_batch misses.
+_batch_pool = ThreadPoolExecutor(max_workers=OLLAMA_NUM_PARALLEL)
+
+def _chat_kwargs(prompt: str) -> dict:
+    return dict(
         model=OLLAMA_MODEL,
         messages=[
-            {"role": "system", "content": system_prompt},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
+        options=OLLAMA_OPTIONS,
+        keep_alive=OLLAMA_KEEP_ALIVE,
     )
 
+def ollama_chat(prompt: str) -> str:
+    response = ollama.chat(**_chat_kwargs(prompt))
     return response["message"]["content"].strip()
 
+def warm_up_model():
+    # Loads both models (and the system-prompt cache) before the first visitor
+    try:
+        semantic_cache.embed("hi")
+        logger.info("✅ Embedding model warmed up")
+    except Exception as e:
+        logger.warning("⚠️ Embedding warm-up failed: %s", e)
+
+    try:
+        ollama_chat("hi")
+        logger.info("✅ Ollama model warmed up")
+    except Exception as e:
+        logger.warning("⚠️ Ollama warm-up failed: %s", e)
+
+_embed_failure_logged = False
+
+def _cache_lookup_many(keys):
+    """Embeds normalized prompts and checks the cache; (vecs, hits) per key.
+
+    If embedding fails, every vec and hit is None so callers skip the cache.
+    """
+    global _embed_failure_logged
+    try:
+        vecs = semantic_cache.embed_many(keys)
+    except Exception as e:
+        if not _embed_failure_logged:
+            _embed_failure_logged = True
+            logger.warning("⚠️ Embedding failed, semantic cache skipped: %s", e)
+        return [None] * len(keys), [None] * len(keys)
+    return vecs, [semantic_cache.get(key, vec) for key, vec in zip(keys, vecs)]
+
+def _cache_lookup(prompt: str):
+    key = normalize_intent(prompt)
+    vecs, hits = _cache_lookup_many([key])
+    return key, vecs[0], hits[0]
+
+def ollama_reply(prompt: str) -> str:
+    key, vec, cached = _cache_lookup(prompt)
+    if cached:
+        return cached
+
+    reply = ollama_chat(prompt)
+    if vec is not None:
+        semantic_cache.set(key, vec, reply)
+    return reply
+
+def ollama_replies(prompts):
+    """Like ollama_reply for a list; cache misses are generated concurrently.
+
+    A prompt whose generation fails gets None instead of failing the batch.
+    """
+    keys = [normalize_intent(p) for p in prompts]
+    vecs, replies = _cache_lookup_many(keys)
+
+    # One chat per distinct miss, however often it repeats in the batch
+    misses = {}
+    for i, reply in enumerate(replies):
+        if not reply:
+            misses.setdefault(keys[i], i)
+    futures = {
+        key: _batch_pool.submit(ollama_chat, prompts[i]) for key, i in misses.items()
+    }
+
+    fresh = {}
+    for key, future in futures.items():
+        try:
+            fresh[key] = future.result()
+        except Exception as e:
+            logger.warning("⚠️ Ollama reply failed: %s", e)
+            fresh[key] = None
+            continue
+        i = misses[key]
+        if vecs[i] is not None:
+            semantic_cache.set(key, vecs[i], fresh[key])
+
+    for i, key in enumerate(keys):
+        if not replies[i]:
+            replies[i] = fresh[key]
+    return replies
+
+def ollama_reply_stream(prompt: str):
+    """Yields the reply piece by piece as Ollama generates it."""
+    key, vec, cached = _cache_lookup(prompt)
+    if cached:
+        yield cached
+        return
+
+    # Same text as the stripped JSON reply: drop leading whitespace and hold
+    # back trailing whitespace until more text follows it.
+    parts, pending = [], ""
+    for chunk in ollama.chat(**_chat_kwargs(prompt), stream=True):
+        text = chunk["message"]["content"]
+        if not parts:
+            text = text.lstrip()
+        body = text.rstrip()
+        if not body:
+            pending += text
+            continue
+        piece = pending + body
+        pending = text[len(body):]
+        parts.append(piece)
+        yield piece
+
+    reply = "".join(parts)
+    if vec is not None:
+        semantic_cache.set(key, vec, reply)
+
 # ============================
 # API
 # ============================
+def json_response(payload) -> Response:
+    return Response(orjson.dumps(payload), mimetype="application/json")
 
-@app.route("/ask", methods=["POST"])
-def ask():
-    data = request.get_json(silent=True) or {}
-    user_text = data.get("text", "").strip()
+def read_json() -> dict:
+    # Skips Werkzeug's cached copy of the body and its stdlib JSON parser
+    raw = request.get_data(cache=False)
+    try:
+        data = orjson.loads(raw) if raw else {}
+    except orjson.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def log_exchange(user_text: str, reply: str):
+    logger.info("USER : %s\nAARYA: %s\n%s", user_text, reply, "-" * 40)
 
+def fast_reply(user_text: str):
+    """Answers that never need Ollama, or None."""
     if not user_text:
-        reply = "Please say something."
-        print("USER :", user_text)
-        print("AARYA:", reply)
-        print("-" * 40)
-        return jsonify({"reply": reply})
+        return "Please say something."
 
     # 1️⃣ Math FIRST
     math_reply = try_math(user_text)
     if math_reply:
-        print("USER :", user_text)
-        print("AARYA:", math_reply)
-        print("-" * 40)
-        return jsonify({"reply": math_reply})
+        return math_reply
 
     # 2️⃣ Local answers
-    reply = local_answer(user_text)
+    return local_answer(user_text)
+
+@app.route("/ask", methods=["POST"])
+def ask():
+    data = read_json()
+    text = data.get("text", "")
+    if not isinstance(text, str):
+        return json_response({"error": "text must be a string"}), 400
+    user_text = text.strip()
+
+    reply = fast_reply(user_text)
     if reply:
-        print("USER :", user_text)
-        print("AARYA:", reply)
-        print("-" * 40)
-        return jsonify({"reply": reply})
+        log_exchange(user_text, reply)
+        return json_response({"reply": reply})
 
     # 3️⃣ Ollama
+    if data.get("stream"):
+        # Plain-text chunks as tokens arrive, so TTS can start before generation ends
+        def generate():
+            parts = []
+            for text in ollama_reply_stream(user_text):
+                parts.append(text)
+                yield text
+            log_exchange(user_text, "".join(parts))
+
+        return Response(generate(), mimetype="text/plain")
+
     reply = ollama_reply(user_text)
-    print("USER :", user_text)
-    print("AARYA:", reply)
-    print("-" * 40)
-    return jsonify({"reply": reply})
+    log_exchange(user_text, reply)
+    return json_response({"reply": reply})
+
+@app.route("/ask_batch", methods=["POST"])
+def ask_batch():
+    data = read_json()
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+        return json_response({"error": "texts must be a list of strings"}), 400
+    if len(texts) > BATCH_MAX_TEXTS:
+        return json_response({"error": f"at most {BATCH_MAX_TEXTS} texts per batch"}), 400
+
+    user_texts = [t.strip() for t in texts]
+    replies = [fast_reply(t) for t in user_texts]
+
+    # 3️⃣ Ollama, all leftovers at once
+    misses = [i for i, reply in enumerate(replies) if not reply]
+    if misses:
+        for i, reply in zip(misses, ollama_replies([user_texts[i] for i in misses])):
+            replies[i] = reply
+
+    for user_text, reply in zip(user_texts, replies):
+        log_exchange(user_text, reply)
+    return json_response({"replies": replies})
 
 
 # ============================
 # START
 # ============================
+# Production: gunicorn -c gunicorn.conf.py ai_server:app
+# The block below is the Flask dev server, for local testing only.
 if __name__ == "__main__":
-    print("🤖 AARYA AI SERVER RUNNING")
+    print(f"🤖 AARYA AI SERVER RUNNING (dev server, persona {AARYA_PERSONA}, {OLLAMA_MODEL})")
     print(f"Listening on {HOST}:{PORT}")
-    app.run(host=HOST, port=PORT, threaded=True)
+    threading.Thread(target=warm_up_model, daemon=True).start()
+    app.run(host=HOST, port=PORT)
 
@@ -0,0 +1,20 @@
+# gunicorn -c gunicorn.conf.py ai_server:app
+# AARYA_PERSONA=v2 gunicorn -c gunicorn.conf.py ai_server:app
+
+import threading
+
+bind = "0.0.0.0:8000"
+workers = 4
+worker_class = "gthread"
+threads = 8
+timeout = 120  # Ollama fallbacks can take a while on CPU
+keepalive = 5
+
+# Each worker starts its own log-listener thread on import,
+# so the app must not be preloaded in the master before forking.
+preload_app = False
+
+
+def post_worker_init(worker):
+    from ai_server import warm_up_model
+    threading.Thread(target=warm_up_model, daemon=True).start()